@@ -1,5 +1,7 @@
 """AI语音命令包"""
 
 from .list_characters_command import ListAICharactersCommand
+from .voice_status_command import VoiceSendStatusCommand
+from .clear_cache_command import ClearVoiceCacheCommand
 
-__all__ = ['ListAICharactersCommand']
+__all__ = ['ListAICharactersCommand', 'VoiceSendStatusCommand', 'ClearVoiceCacheCommand']
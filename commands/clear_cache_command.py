@@ -0,0 +1,45 @@
+from src.plugin_system import BaseCommand
+from typing import Tuple
+
+from ..utils.stream_cache import stream_group_cache
+
+
+class ClearVoiceCacheCommand(BaseCommand):
+    """AI语音缓存清理命令 - 响应/ai_voice_cache命令（仅管理员）"""
+
+    command_name = "clear_ai_voice_cache"
+    command_description = "清空群号解析缓存或AI语音不可用的负缓存（仅管理员）"
+    command_pattern = r"^/(ai_voice_cache|语音缓存)(?:\s+(?P<target>all|resolve|negative))?$"
+
+    def __init__(self, message=None, plugin_config=None):
+        """初始化命令组件
+
+        Args:
+            message: 消息对象
+            plugin_config: 插件配置字典
+        """
+        super().__init__(message, plugin_config)
+
+    async def execute(self) -> Tuple[bool, str, bool]:
+        """执行缓存清理"""
+        try:
+            # 权限检查
+            admin_users = [str(uid) for uid in self.get_config("cache.admin_users", [])]
+            user_id = str(self.message.message_info.user_info.user_id)
+            if user_id not in admin_users:
+                await self.send_text("❌ 只有管理员可以清理AI语音缓存")
+                return False, "无权限清理缓存", True
+
+            target = self.matched_groups.get("target") or "all"
+            before = stream_group_cache.stats()
+            count = stream_group_cache.clear(target)
+
+            await self.send_text(
+                f"🧹 已清理AI语音缓存（{target}），共 {count} 条\n"
+                f"清理前：解析缓存 {before['resolve']} 条，负缓存 {before['negative']} 条"
+            )
+            return True, f"清理了{count}条缓存", True
+
+        except Exception as e:
+            await self.send_text(f"❌ 执行失败: {str(e)}")
+            return False, f"执行失败: {str(e)}", True
@@ -2,6 +2,8 @@ from src.plugin_system import BaseCommand
 from typing import Tuple, Optional
 import aiohttp
 
+from ..utils.traffic_recorder import traffic_recorder
+
 
 class ListAICharactersCommand(BaseCommand):
     """AI角色列表查询命令 - 响应/ai_roles命令"""
@@ -34,6 +36,7 @@ class ListAICharactersCommand(BaseCommand):
             api_url = self.get_config("napcat.api_url", "http://127.0.0.1:3000")
             access_token = self.get_config("napcat.access_token", None)
             timeout = self.get_config("timeout.request_timeout", 30)
+            traffic_recorder.configure_from(self.get_config)
             
             # 查询角色列表
             result = await self._fetch_characters(api_url, access_token, timeout, str(group_id))
@@ -55,6 +58,7 @@ class ListAICharactersCommand(BaseCommand):
     async def _fetch_characters(self, api_url: str, access_token: Optional[str], 
                                 timeout: int, group_id: str) -> dict:
         """通过NapCat API获取角色列表"""
+        call_id = traffic_recorder.new_call_id()
         try:
             url = f"{api_url}/get_ai_characters"
             # chat_type固定为1（群聊），因为API只支持群聊AI语音
@@ -67,9 +71,9 @@ class ListAICharactersCommand(BaseCommand):
             if access_token:
                 headers["Authorization"] = f"Bearer {access_token}"
             
-            async with aiohttp.ClientSession() as session:
+            async with traffic_recorder.track("command", call_id, "get_ai_characters", payload) as call, aiohttp.ClientSession() as session:
                 async with session.post(url, json=payload, headers=headers, timeout=timeout) as response:
-                    result = await response.json()
+                    result = await call.read_json(response)
                     
                     if result.get('status') == 'ok' or result.get('retcode') == 0:
                         data = result.get('data', [])
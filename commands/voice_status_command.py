@@ -0,0 +1,77 @@
+from src.plugin_system import BaseCommand
+from typing import Tuple
+import time
+
+from ..utils.voice_send_queue import voice_send_queue
+
+
+class VoiceSendStatusCommand(BaseCommand):
+    """AI语音发送状态查询命令 - 响应/ai_voice_status命令"""
+
+    command_name = "ai_voice_status"
+    command_description = "查询异步模式下AI语音的发送状态"
+    command_pattern = r"^/(ai_voice_status|语音状态)(?:\s+(?P<task_id>\S+))?$"
+
+    # 状态显示文本
+    STATUS_TEXT = {
+        'pending': '⏳ 排队中',
+        'sending': '📤 发送中',
+        'success': '✅ 已发送',
+        'failed': '❌ 失败',
+    }
+
+    def __init__(self, message=None, plugin_config=None):
+        """初始化命令组件
+
+        Args:
+            message: 消息对象
+            plugin_config: 插件配置字典
+        """
+        super().__init__(message, plugin_config)
+
+    async def execute(self) -> Tuple[bool, str, bool]:
+        """执行发送状态查询"""
+        try:
+            task_id = self.matched_groups.get("task_id")
+
+            group_info = self.message.message_info.group_info
+            if not group_info or not group_info.group_id:
+                await self.send_text("❌ 此命令只能在群聊中使用")
+                return False, "命令只能在群聊中使用", True
+            group_id = str(group_info.group_id)
+
+            # 查询单个任务（只能查询本群的任务）
+            if task_id:
+                entry = voice_send_queue.get_status(task_id)
+                if not entry or entry['group_id'] != group_id:
+                    await self.send_text(f"❌ 未找到任务 {task_id}（可能已过期）")
+                    return False, f"未找到任务 {task_id}", True
+                await self.send_text(self._format_entry(entry))
+                return True, f"显示了任务 {task_id} 的状态", True
+
+            # 查询当前群最近的任务
+            entries = voice_send_queue.list_recent(limit=10, group_id=group_id)
+            if not entries:
+                await self.send_text("📭 当前群暂无AI语音发送记录")
+                return True, "暂无发送记录", True
+
+            lines = [f"🎤 最近 {len(entries)} 条AI语音发送记录", "━━━━━━━━━━━━━━━━━━━━━━"]
+            for entry in entries:
+                lines.append(self._format_entry(entry))
+            await self.send_text("\n".join(lines))
+            return True, f"显示了{len(entries)}条发送记录", True
+
+        except Exception as e:
+            await self.send_text(f"❌ 执行失败: {str(e)}")
+            return False, f"执行失败: {str(e)}", True
+
+    def _format_entry(self, entry: dict) -> str:
+        """格式化单条发送状态"""
+        created = time.strftime("%H:%M:%S", time.localtime(entry['created_at']))
+        status = self.STATUS_TEXT.get(entry['status'], entry['status'])
+        line = f"[{entry['task_id']}] {created} {entry['character_name']} {status}"
+        if entry['status'] == 'success':
+            line += f" (message_id={entry['message_id']})"
+        elif entry['status'] == 'failed':
+            line += f": {entry['error']}"
+        return line
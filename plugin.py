@@ -7,6 +7,8 @@ from .tools.ai_voice_send_tool import AIVoiceSendTool
 
 # 导入命令类
 from .commands.list_characters_command import ListAICharactersCommand
+from .commands.voice_status_command import VoiceSendStatusCommand
+from .commands.clear_cache_command import ClearVoiceCacheCommand
 
 
 @register_plugin
@@ -27,6 +29,9 @@ class AIVoicePlugin(BasePlugin):
         "plugin": "插件基本配置",
         "napcat": "NapCat API连接配置",
         "timeout": "超时设置",
+        "send": "语音发送配置",
+        "cache": "群号解析与负缓存配置",
+        "record": "NapCat流量录制配置（用于离线回放压测）",
         "logging": "日志配置"
     }
     
@@ -40,7 +45,7 @@ class AIVoicePlugin(BasePlugin):
             ),
             "config_version": ConfigField(
                 type=str,
-                default="1.0.0",
+                default="1.3.0",
                 description="配置文件版本"
             )
         },
@@ -64,6 +69,73 @@ class AIVoicePlugin(BasePlugin):
                 description="HTTP请求超时时间（秒）"
             )
         },
+        "send": {
+            "async_mode": ConfigField(
+                type=bool,
+                default=False,
+                description="是否启用异步发送模式（工具提交任务后立即返回，由后台发送语音）"
+            ),
+            "max_workers": ConfigField(
+                type=int,
+                default=2,
+                description="异步模式下后台并发发送的worker数量"
+            ),
+            "max_pending": ConfigField(
+                type=int,
+                default=50,
+                description="异步模式下最多排队等待的发送任务数"
+            ),
+            "status_table_size": ConfigField(
+                type=int,
+                default=100,
+                description="保留的发送状态记录条数（可通过/ai_voice_status查询）"
+            ),
+            "report_failure": ConfigField(
+                type=bool,
+                default=False,
+                description="异步模式下发送失败时是否在聊天中提示"
+            )
+        },
+        "cache": {
+            "negative_ttl": ConfigField(
+                type=int,
+                default=600,
+                description="私聊或未开通AI语音的群的负缓存时间（秒），0为不缓存"
+            ),
+            "max_entries": ConfigField(
+                type=int,
+                default=1000,
+                description="解析缓存与负缓存各自的最大条目数"
+            ),
+            "admin_users": ConfigField(
+                type=list,
+                default=[],
+                description="允许使用/ai_voice_cache清理缓存的QQ号列表",
+                example='["123456789"]'
+            )
+        },
+        "record": {
+            "enabled": ConfigField(
+                type=bool,
+                default=False,
+                description="是否录制发往NapCat的请求、响应与耗时"
+            ),
+            "trace_file": ConfigField(
+                type=str,
+                default="traces/napcat_trace.jsonl",
+                description="trace文件路径（相对路径以插件目录为基准）"
+            ),
+            "anonymize": ConfigField(
+                type=bool,
+                default=True,
+                description="是否将群号替换为匿名数字（access_token始终不会被记录，语音文本只记录长度）"
+            ),
+            "anonymize_salt": ConfigField(
+                type=str,
+                default="",
+                description="群号匿名化的盐值，留空则每次启动随机生成（多次录制需要群号一致时填写）"
+            )
+        },
         "logging": {
             "level": ConfigField(
                 type=str,
@@ -89,4 +161,6 @@ class AIVoicePlugin(BasePlugin):
             (AICharacterListTool.get_tool_info(), AICharacterListTool),
             (AIVoiceSendTool.get_tool_info(), AIVoiceSendTool),
             (ListAICharactersCommand.get_command_info(), ListAICharactersCommand),
+            (VoiceSendStatusCommand.get_command_info(), VoiceSendStatusCommand),
+            (ClearVoiceCacheCommand.get_command_info(), ClearVoiceCacheCommand),
         ]
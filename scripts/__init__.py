@@ -0,0 +1 @@
+"""AI语音插件离线工具包"""
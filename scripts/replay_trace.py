@@ -0,0 +1,282 @@
+"""NapCat流量回放工具
+
+读取 record.enabled 录制的trace，启动本地NapCat替身服务按录制的响应和耗时应答，
+并按原始的调用组合重新驱动 AIVoiceSendTool / AICharacterListTool，
+回放过程本身也会被录制，最后对比两份trace的调用次数与延迟。
+
+需要在麦麦根目录下以模块方式运行（工具依赖麦麦插件系统）：
+
+    python -m plugins.maimai_aivoice_plugin.scripts.replay_trace traces/napcat_trace.jsonl --speed 10 --multiplier 4
+    python -m plugins.maimai_aivoice_plugin.scripts.replay_trace --compare run_a.jsonl run_b.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from aiohttp import web
+
+from ..tools.ai_character_list_tool import AICharacterListTool
+from ..tools.ai_voice_send_tool import AIVoiceSendTool
+from ..utils.stream_cache import stream_group_cache
+from ..utils.traffic_recorder import traffic_recorder
+
+
+def load_trace(path: str) -> List[Dict[str, Any]]:
+    """读取trace文件，按时间排序"""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    records.sort(key=lambda r: r["ts"])
+    return records
+
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """按接口统计调用次数、成功率与延迟分位数"""
+    latencies = defaultdict(list)
+    failures = defaultdict(int)
+    for r in records:
+        latencies[r["ep"]].append(r["ms"])
+        resp = r.get("resp") or {}
+        if r.get("err") or not (resp.get("status") == "ok" or resp.get("retcode") == 0):
+            failures[r["ep"]] += 1
+
+    summary = {}
+    for ep, values in latencies.items():
+        values.sort()
+        summary[ep] = {
+            "calls": len(values),
+            "failed": failures[ep],
+            "p50": _percentile(values, 0.50),
+            "p95": _percentile(values, 0.95),
+            "max": values[-1],
+        }
+    return summary
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def print_comparison(base: Dict[str, Dict[str, Any]], other: Dict[str, Dict[str, Any]],
+                     base_label: str = "原始", other_label: str = "回放"):
+    """打印两份统计的对比"""
+    print(f"{'接口':<24}{'指标':<8}{base_label:>12}{other_label:>12}{'差异':>12}")
+    print("-" * 68)
+    for ep in sorted(set(base) | set(other)):
+        a, b = base.get(ep, {}), other.get(ep, {})
+        for key in ("calls", "failed", "p50", "p95", "max"):
+            va, vb = a.get(key, 0), b.get(key, 0)
+            diff = vb - va
+            if key in ("calls", "failed"):
+                diff_text = f"{diff:+d}"
+            else:
+                diff_text = f"{diff:+.1f}ms" if not va else f"{diff / va * 100:+.1f}%"
+            print(f"{ep:<24}{key:<8}{va:>12}{vb:>12}{diff_text:>12}")
+        print()
+
+
+class StandInNapCat:
+    """本地NapCat替身服务，按 (接口, 群号) 依次返回录制的响应，用完后循环"""
+
+    def __init__(self, records: List[Dict[str, Any]], latency_scale: float = 1.0):
+        self.latency_scale = latency_scale
+        self._responses = defaultdict(list)
+        self._cursor = defaultdict(int)
+        for r in records:
+            self._responses[(r["ep"], r["req"].get("group_id"))].append(r)
+
+        self.app = web.Application()
+        self.app.router.add_post("/get_ai_characters", self._handle)
+        self.app.router.add_post("/send_group_ai_record", self._handle)
+        self._runner = None
+        self.url = None
+
+    async def start(self) -> str:
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self.url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        endpoint = request.path.lstrip("/")
+        payload = await request.json()
+        key = (endpoint, payload.get("group_id"))
+
+        candidates = self._responses.get(key)
+        if not candidates:
+            return web.json_response({"status": "failed", "retcode": 1404, "message": "replay: 无录制的响应"})
+
+        record = candidates[self._cursor[key] % len(candidates)]
+        self._cursor[key] += 1
+        await asyncio.sleep(record["ms"] / 1000 * self.latency_scale)
+
+        if record.get("resp") is None:
+            # 原始请求发生了网络/解析异常，返回非JSON响应让插件走相同的异常分支
+            return web.Response(status=record.get("http") or 502, text=record.get("err", "replay error"))
+        return web.json_response(record["resp"], status=record.get("http") or 200)
+
+
+class _ReplayStream:
+    """回放用的聊天流占位对象，只提供stream_id"""
+
+    def __init__(self, group_id):
+        self.stream_id = f"replay-{group_id}"
+
+
+def build_invocations(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """将NapCat请求按调用ID还原为工具调用
+
+    send_tool 的调用还原为 send_ai_voice（角色名通过同一调用中的角色列表响应反查），
+    list_tool 与 command 的调用都还原为 get_ai_character_list（二者的NapCat请求相同）。
+    """
+    calls = defaultdict(list)
+    for r in records:
+        calls[r["call"]].append(r)
+
+    invocations = []
+    for call_records in calls.values():
+        first = call_records[0]
+        group_id = first["req"].get("group_id")
+        if first["src"] != "send_tool":
+            invocations.append({"ts": first["ts"], "tool": "list", "group_id": group_id, "args": {}})
+            continue
+
+        names = {}
+        for r in call_records:
+            if r["ep"] == "get_ai_characters" and r.get("resp"):
+                for category in r["resp"].get("data") or []:
+                    for char in category.get("characters", []):
+                        names[char.get("character_id")] = char.get("character_name")
+
+        send = next((r for r in call_records if r["ep"] == "send_group_ai_record"), None)
+        if send:
+            character_name = names.get(send["req"].get("character"), send["req"].get("character"))
+            text = "测" * max(1, send["req"].get("text_len", 1))
+        else:
+            # 原始调用在发送前就结束了（如角色不存在），用不存在的角色名复现
+            character_name = "__replay_unknown__"
+            text = "测试"
+        invocations.append({
+            "ts": first["ts"],
+            "tool": "send",
+            "group_id": group_id,
+            "args": {"character_name": character_name, "text": text},
+        })
+
+    invocations.sort(key=lambda inv: inv["ts"])
+    return invocations
+
+
+async def replay(trace_path: str, output_path: str, speed: float, multiplier: int,
+                 max_gap: float, latency_scale: float):
+    records = load_trace(trace_path)
+    if not records:
+        print("trace为空")
+        return
+
+    invocations = build_invocations(records)
+    server = StandInNapCat(records, latency_scale)
+    url = await server.start()
+
+    plugin_config = {
+        "napcat": {"api_url": url, "access_token": ""},
+        "timeout": {"request_timeout": 30},
+        "send": {"async_mode": False},
+        # 回放trace中的群号已是匿名值，不再二次匿名
+        "record": {"enabled": True, "trace_file": output_path, "anonymize": False},
+    }
+
+    stream_group_cache.clear("all")
+    for inv in invocations:
+        stream_group_cache.remember(f"replay-{inv['group_id']}", inv["group_id"])
+
+    tool_latency = defaultdict(list)
+
+    async def run_one(inv):
+        stream = _ReplayStream(inv["group_id"])
+        tool_cls = AIVoiceSendTool if inv["tool"] == "send" else AICharacterListTool
+        tool = tool_cls(plugin_config, stream)
+        started = time.monotonic()
+        await tool.execute(inv["args"])
+        tool_latency[tool_cls.name].append((time.monotonic() - started) * 1000)
+
+    # 按原始时间轴调度，空闲间隔最多保留max_gap秒，再按speed压缩
+    schedule, offset, prev_ts = [], 0.0, invocations[0]["ts"]
+    for inv in invocations:
+        offset += min(inv["ts"] - prev_ts, max_gap)
+        prev_ts = inv["ts"]
+        schedule.append((offset / speed, inv))
+
+    print(f"回放 {len(invocations)} 次工具调用 x{multiplier}，NapCat替身: {url}")
+    start = time.monotonic()
+    tasks = []
+    try:
+        for at, inv in schedule:
+            delay = at - (time.monotonic() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.extend(asyncio.create_task(run_one(inv)) for _ in range(multiplier))
+        await asyncio.gather(*tasks)
+    finally:
+        traffic_recorder.close()
+        await server.stop()
+
+    print(f"回放完成，耗时 {time.monotonic() - start:.1f}s，回放trace: {output_path}\n")
+    for name, values in tool_latency.items():
+        values.sort()
+        print(f"[工具] {name}: {len(values)} 次，p50={_percentile(values, 0.5):.1f}ms "
+              f"p95={_percentile(values, 0.95):.1f}ms max={values[-1]:.1f}ms")
+    print()
+
+    # 倍增后的原始调用次数才是对比基准
+    baseline = summarize(records)
+    for stats in baseline.values():
+        stats["calls"] *= multiplier
+        stats["failed"] *= multiplier
+    print_comparison(baseline, summarize(load_trace(output_path)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="回放NapCat流量trace并对比调用次数与延迟")
+    parser.add_argument("trace", nargs="?", help="录制的trace文件")
+    parser.add_argument("--output", help="回放trace输出路径（默认 <trace>.replay.jsonl）")
+    parser.add_argument("--speed", type=float, default=1.0, help="时间压缩倍数，如10表示调用间隔缩短为1/10")
+    parser.add_argument("--multiplier", type=int, default=1, help="并发倍数，每次调用同时重放的份数")
+    parser.add_argument("--max-gap", type=float, default=5.0, help="调用之间最长保留的空闲间隔（秒）")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="替身服务响应耗时的缩放比例")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "OTHER"), help="仅对比两份trace")
+    args = parser.parse_args()
+
+    if args.compare:
+        base, other = args.compare
+        print_comparison(summarize(load_trace(base)), summarize(load_trace(other)), "BASE", "OTHER")
+        return
+
+    if not args.trace:
+        parser.error("需要指定trace文件")
+
+    output = os.path.abspath(args.output or f"{args.trace}.replay.jsonl")
+    # 每次回放重新生成，避免与上次结果混在一起
+    open(output, "w").close()
+    asyncio.run(replay(args.trace, output, args.speed, max(1, args.multiplier),
+                       args.max_gap, args.latency_scale))
+
+
+if __name__ == "__main__":
+    main()
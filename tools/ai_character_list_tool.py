@@ -1,8 +1,10 @@
 from src.plugin_system import BaseTool, get_logger, ToolParamType
-from src.plugin_system.apis import chat_api
 import aiohttp
 from typing import Dict, Any
 
+from ..utils.stream_cache import stream_group_cache
+from ..utils.traffic_recorder import traffic_recorder
+
 
 class AICharacterListTool(BaseTool):
     """AI角色列表查询工具"""
@@ -40,6 +42,13 @@ class AICharacterListTool(BaseTool):
         self.access_token = self.get_config("napcat.access_token", None)
         self.timeout = self.get_config("timeout.request_timeout", 30)
         
+        stream_group_cache.configure(
+            negative_ttl=self.get_config("cache.negative_ttl", 600),
+            max_entries=self.get_config("cache.max_entries", 1000)
+        )
+        traffic_recorder.configure_from(self.get_config)
+        self._call_id = traffic_recorder.new_call_id()
+        
         self.logger.debug(
             "AI角色列表工具初始化完成",
             api_url=self.api_url,
@@ -53,33 +62,19 @@ class AICharacterListTool(BaseTool):
         self.logger.info(f"[参数] 收到的参数: {function_args}")
         
         try:
-            # 从chat_stream自动获取group_id
-            group_id = None
+            # 从chat_stream自动获取group_id（优先使用解析缓存，并检查负缓存）
             self.logger.info("[查询] 从chat_stream获取群号")
-            
-            if self.chat_stream:
-                self.logger.info(f"   - chat_stream存在: {self.chat_stream}")
-                try:
-                    # 使用官方API获取聊天流信息
-                    stream_info = chat_api.get_stream_info(self.chat_stream)
-                    group_id = stream_info.get('group_id')
-                    if group_id:
-                        self.logger.info(f"   [成功] 成功获取group_id: {group_id}")
-                    else:
-                        self.logger.warning("   [警告] stream_info中没有group_id（可能不是群聊）")
-                except Exception as e:
-                    self.logger.warning(f"   [警告] 获取stream_info失败: {e}")
-            else:
-                self.logger.warning("   [警告] chat_stream为None")
+            group_id, unavailable_error = stream_group_cache.resolve_or_reject(self.chat_stream)
             
             # 参数验证
-            if not group_id:
-                self.logger.error("[错误] 参数验证失败: 无法获取group_id")
+            if unavailable_error:
+                self.logger.error(unavailable_error)
                 self.logger.info("=" * 60)
                 return {
                     "name": self.name,
-                    "content": "[错误] 无法获取群号，此功能只能在群聊中使用"
+                    "content": unavailable_error
                 }
+            self.logger.info(f"   [成功] 成功获取group_id: {group_id}")
             
             self.logger.info("[成功] 参数验证通过")
             self.logger.info(f"[准备] 准备查询群 {group_id} 的AI角色列表")
@@ -96,6 +91,8 @@ class AICharacterListTool(BaseTool):
                     group_id=group_id,
                     character_count=len(characters)
                 )
+                if not characters:
+                    stream_group_cache.mark_unavailable('group', group_id, "未找到可用的AI语音角色")
                 formatted_result = self._format_character_list(characters, group_id)
                 self.logger.info(f"[格式化] 格式化的结果长度: {len(formatted_result)} 字符")
                 self.logger.info("=" * 60)
@@ -110,6 +107,9 @@ class AICharacterListTool(BaseTool):
                     error=error_msg,
                     group_id=group_id
                 )
+                # 仅缓存NapCat明确返回的错误，网络异常可能是临时的
+                if result.get('api_error'):
+                    stream_group_cache.mark_unavailable('group', group_id, error_msg)
                 self.logger.info("=" * 60)
                 return {
                     "name": self.name,
@@ -158,7 +158,7 @@ class AICharacterListTool(BaseTool):
             
             # 发送HTTP POST请求
             self.logger.info(f"[等待] 开始发送HTTP POST请求 (timeout={self.timeout}s)")
-            async with aiohttp.ClientSession() as session:
+            async with traffic_recorder.track("list_tool", self._call_id, "get_ai_characters", payload) as call, aiohttp.ClientSession() as session:
                 async with session.post(
                     url, 
                     json=payload, 
@@ -167,7 +167,7 @@ class AICharacterListTool(BaseTool):
                 ) as response:
                     self.logger.info(f"[响应] 收到HTTP响应，状态码: {response.status}")
                     
-                    result = await response.json()
+                    result = await call.read_json(response)
                     
                     self.logger.info(f"[数据] API响应内容: {result}")
                     
@@ -209,7 +209,8 @@ class AICharacterListTool(BaseTool):
                         self.logger.error(f"[警告] API返回错误: {error_msg}, retcode={retcode}")
                         return {
                             'success': False,
-                            'error': error_msg
+                            'error': error_msg,
+                            'api_error': True
                         }
                 
         except aiohttp.ClientError as e:
@@ -1,8 +1,12 @@
 from src.plugin_system import BaseTool, get_logger, ToolParamType
-from src.plugin_system.apis import chat_api
+from src.plugin_system.apis import send_api
 import aiohttp
 from typing import Dict, Any
 
+from ..utils.voice_send_queue import voice_send_queue
+from ..utils.stream_cache import stream_group_cache
+from ..utils.traffic_recorder import traffic_recorder
+
 class AIVoiceSendTool(BaseTool):
     """AI语音发送工具 - 自动查询角色列表并发送语音"""
     
@@ -45,11 +49,29 @@ class AIVoiceSendTool(BaseTool):
         self.api_url = self.get_config("napcat.api_url", "http://127.0.0.1:3000")
         self.access_token = self.get_config("napcat.access_token", None)
         self.timeout = self.get_config("timeout.request_timeout", 30)
+        self.async_mode = self.get_config("send.async_mode", False)
+        self.report_failure = self.get_config("send.report_failure", False)
+        
+        stream_group_cache.configure(
+            negative_ttl=self.get_config("cache.negative_ttl", 600),
+            max_entries=self.get_config("cache.max_entries", 1000)
+        )
+        
+        if self.async_mode:
+            voice_send_queue.configure(
+                max_workers=self.get_config("send.max_workers", 2),
+                max_pending=self.get_config("send.max_pending", 50),
+                status_table_size=self.get_config("send.status_table_size", 100)
+            )
+        
+        traffic_recorder.configure_from(self.get_config)
+        self._call_id = traffic_recorder.new_call_id()
         
         self.logger.debug(
             "AI语音发送工具初始化完成",
             api_url=self.api_url,
-            timeout=self.timeout
+            timeout=self.timeout,
+            async_mode=self.async_mode
         )
     
     async def execute(self, function_args: Dict[str, Any]):
@@ -66,36 +88,31 @@ class AIVoiceSendTool(BaseTool):
             self.logger.info(f"   - character_name: {character_name}")
             self.logger.info(f"   - text: {text}")
             
-            # 从chat_stream自动获取group_id
-            group_id = None
+            # 从chat_stream自动获取group_id（优先使用解析缓存，并检查负缓存）
             self.logger.info("[查询] 从chat_stream获取群号")
-            
-            if self.chat_stream:
-                try:
-                    stream_info = chat_api.get_stream_info(self.chat_stream)
-                    group_id = stream_info.get('group_id')
-                    if group_id:
-                        self.logger.info(f"   [成功] 成功获取group_id: {group_id}")
-                except Exception as e:
-                    self.logger.warning(f"   [警告] 获取stream_info失败: {e}")
+            group_id, unavailable_error = stream_group_cache.resolve_or_reject(self.chat_stream)
             
             # 参数验证
             if not character_name:
                 self.logger.error("[错误] 参数验证失败: 缺少character_name参数")
+                self.logger.info("=" * 60)
                 return {
                     "name": self.name,
                     "content": "[错误] 缺少必需参数: character_name (AI角色名称)"
                 }
             
-            if not group_id:
-                self.logger.error("[错误] 参数验证失败: 无法获取group_id")
+            if unavailable_error:
+                self.logger.error(unavailable_error)
+                self.logger.info("=" * 60)
                 return {
                     "name": self.name,
-                    "content": "[错误] 无法获取群号，此功能只能在群聊中使用"
+                    "content": unavailable_error
                 }
+            self.logger.info(f"   [成功] 成功获取group_id: {group_id}")
             
             if not text:
                 self.logger.error("[错误] 参数验证失败: 缺少text参数")
+                self.logger.info("=" * 60)
                 return {
                     "name": self.name,
                     "content": "[错误] 缺少必需参数: text (语音内容)"
@@ -110,11 +127,21 @@ class AIVoiceSendTool(BaseTool):
             if not characters_result.get('success'):
                 error_msg = characters_result.get('error', '未知错误')
                 self.logger.error(f"[错误] 查询角色列表失败: {error_msg}")
+                # 仅缓存NapCat明确返回的错误，网络异常可能是临时的
+                if characters_result.get('api_error'):
+                    stream_group_cache.mark_unavailable('group', group_id, error_msg)
                 return {
                     "name": self.name,
                     "content": f"[错误] 查询角色列表失败: {error_msg}"
                 }
             
+            if not characters_result.get('characters'):
+                stream_group_cache.mark_unavailable('group', group_id, "未找到可用的AI语音角色")
+                return {
+                    "name": self.name,
+                    "content": "[错误] 本群暂不可用AI语音: 未找到可用的AI语音角色"
+                }
+            
             characters = characters_result.get('characters', [])
             self.logger.info(f"[成功] 成功获取 {len(characters)} 个角色")
             
@@ -136,6 +163,26 @@ class AIVoiceSendTool(BaseTool):
                 }
             
             # 步骤3：发送语音
+            if self.async_mode:
+                self.logger.info(f"[步骤3] 步骤3/3: 提交异步发送任务")
+                submit_result = voice_send_queue.submit(
+                    lambda: self._send_ai_voice(character_id, group_id, text),
+                    group_id,
+                    character_name,
+                    text,
+                    on_failure=self._report_failure if self.report_failure else None
+                )
+                self.logger.info("=" * 60)
+                if not submit_result.get('success'):
+                    return {
+                        "name": self.name,
+                        "content": f"[错误] 提交语音发送任务失败: {submit_result.get('error', '未知错误')}"
+                    }
+                return {
+                    "name": self.name,
+                    "content": f"[成功] 已提交'{character_name}'的语音发送任务（task_id={submit_result['task_id']}），内容：{text}"
+                }
+            
             self.logger.info(f"[步骤3] 步骤3/3: 发送语音")
             send_result = await self._send_ai_voice(character_id, group_id, text)
             
@@ -177,9 +224,9 @@ class AIVoiceSendTool(BaseTool):
             if self.access_token:
                 headers["Authorization"] = f"Bearer {self.access_token}"
             
-            async with aiohttp.ClientSession() as session:
+            async with traffic_recorder.track("send_tool", self._call_id, "get_ai_characters", payload) as call, aiohttp.ClientSession() as session:
                 async with session.post(url, json=payload, headers=headers, timeout=self.timeout) as response:
-                    result = await response.json()
+                    result = await call.read_json(response)
                     
                     if result.get('status') == 'ok' or result.get('retcode') == 0:
                         data = result.get('data', [])
@@ -193,10 +240,20 @@ class AIVoiceSendTool(BaseTool):
                                 })
                         return {'success': True, 'characters': characters}
                     else:
-                        return {'success': False, 'error': result.get('message', '未知错误')}
+                        return {'success': False, 'error': result.get('message', '未知错误'), 'api_error': True}
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
+    async def _report_failure(self, entry: Dict[str, Any]):
+        """异步模式下将发送失败信息回报到当前聊天"""
+        stream_id = getattr(self.chat_stream, 'stream_id', None)
+        if not stream_id:
+            return
+        await send_api.text_to_stream(
+            f"❌ AI语音发送失败（{entry['character_name']}）: {entry['error']}",
+            stream_id
+        )
+    
     async def _send_ai_voice(self, character: str, group_id: str, text: str) -> Dict[str, Any]:
         """发送AI语音"""
         try:
@@ -211,9 +268,9 @@ class AIVoiceSendTool(BaseTool):
             if self.access_token:
                 headers["Authorization"] = f"Bearer {self.access_token}"
             
-            async with aiohttp.ClientSession() as session:
+            async with traffic_recorder.track("send_tool", self._call_id, "send_group_ai_record", payload) as call, aiohttp.ClientSession() as session:
                 async with session.post(url, json=payload, headers=headers, timeout=self.timeout) as response:
-                    result = await response.json()
+                    result = await call.read_json(response)
                     
                     if result.get('status') == 'ok' or result.get('retcode') == 0:
                         return {'success': True, 'message_id': result.get('data', {}).get('message_id', '')}
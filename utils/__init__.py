@@ -0,0 +1,11 @@
+"""AI语音插件公共组件包"""
+
+from .voice_send_queue import VoiceSendQueue, voice_send_queue
+from .stream_cache import StreamGroupCache, stream_group_cache
+from .traffic_recorder import TrafficRecorder, traffic_recorder
+
+__all__ = [
+    'VoiceSendQueue', 'voice_send_queue',
+    'StreamGroupCache', 'stream_group_cache',
+    'TrafficRecorder', 'traffic_recorder',
+]
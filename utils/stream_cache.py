@@ -0,0 +1,149 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from src.plugin_system import get_logger
+from src.plugin_system.apis import chat_api
+
+
+# 非群聊时返回给LLM的固定提示
+NOT_GROUP_CHAT = "无法获取群号，此功能只能在群聊中使用"
+
+
+class StreamGroupCache:
+    """聊天流 -> 群号 解析缓存，以及AI语音不可用的负缓存
+
+    - 解析缓存：stream_id -> group_id，聊天流与群号的对应关系不会变化，只做容量限制
+    - 负缓存：私聊流、未开通AI语音或接口返回错误的群，在TTL内直接拒绝，不再请求NapCat
+    """
+
+    def __init__(self, negative_ttl: int = 600, max_entries: int = 1000):
+        self.logger = get_logger("maimai_aivoice_plugin.stream_cache")
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+
+        self._groups: "OrderedDict[str, str]" = OrderedDict()
+        # key: ('stream', stream_id) / ('group', group_id) -> (过期时间, 原因)
+        self._negative: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+    def configure(self, negative_ttl: int, max_entries: int):
+        """更新缓存参数"""
+        self.negative_ttl = max(0, int(negative_ttl))
+        self.max_entries = max(1, int(max_entries))
+
+    def resolve_group_id(self, chat_stream) -> Optional[str]:
+        """获取聊天流对应的群号，优先读缓存；非群聊返回None"""
+        if not chat_stream:
+            return None
+
+        stream_id = getattr(chat_stream, 'stream_id', None)
+        if stream_id and stream_id in self._groups:
+            self._groups.move_to_end(stream_id)
+            return self._groups[stream_id]
+
+        # 异常直接抛给调用方，不做缓存（可能是临时错误）
+        stream_info = chat_api.get_stream_info(chat_stream)
+        group_id = stream_info.get('group_id')
+        if group_id and stream_id:
+            self._groups[stream_id] = str(group_id)
+            self._evict(self._groups)
+        return str(group_id) if group_id else None
+
+    def resolve_or_reject(self, chat_stream) -> Tuple[Optional[str], Optional[str]]:
+        """解析聊天流对应的群号，并检查聊天流和群是否在负缓存中
+
+        私聊流会被写入负缓存；NapCat侧的群不可用由调用方在请求失败后标记。
+
+        Returns:
+            (group_id, None) 可以继续使用AI语音；(None/group_id, 错误信息) 应直接返回该错误
+        """
+        stream_id = getattr(chat_stream, 'stream_id', None)
+
+        reason = self.get_unavailable_reason('stream', stream_id)
+        if reason:
+            self.logger.info(f"[负缓存] 聊天流 {stream_id} 命中: {reason}")
+            return None, f"[错误] {reason}"
+
+        group_id = None
+        if chat_stream:
+            try:
+                group_id = self.resolve_group_id(chat_stream)
+                if not group_id:
+                    self.mark_unavailable('stream', stream_id, NOT_GROUP_CHAT)
+            except Exception as e:
+                self.logger.warning(f"[警告] 获取stream_info失败: {e}")
+        else:
+            self.logger.warning("[警告] chat_stream为None")
+
+        if not group_id:
+            return None, f"[错误] {NOT_GROUP_CHAT}"
+
+        reason = self.get_unavailable_reason('group', group_id)
+        if reason:
+            self.logger.info(f"[负缓存] 群 {group_id} 命中: {reason}")
+            return group_id, f"[错误] 本群暂不可用AI语音: {reason}"
+
+        return group_id, None
+
+    def remember(self, stream_id: str, group_id: str):
+        """直接写入解析缓存（回放等没有真实聊天流的场景使用）"""
+        self._groups[stream_id] = str(group_id)
+        self._evict(self._groups)
+
+    def get_unavailable_reason(self, kind: str, key: Optional[str]) -> Optional[str]:
+        """查询负缓存，命中且未过期时返回不可用原因
+
+        Args:
+            kind: 'stream' 或 'group'
+            key: stream_id 或 group_id
+        """
+        if not key:
+            return None
+        entry = self._negative.get((kind, str(key)))
+        if not entry:
+            return None
+        expires_at, reason = entry
+        if time.monotonic() >= expires_at:
+            del self._negative[(kind, str(key))]
+            return None
+        return reason
+
+    def mark_unavailable(self, kind: str, key: Optional[str], reason: str):
+        """将聊天流或群标记为AI语音不可用，TTL内不再请求NapCat"""
+        if not key or self.negative_ttl <= 0:
+            return
+        self._negative[(kind, str(key))] = (time.monotonic() + self.negative_ttl, reason)
+        self._negative.move_to_end((kind, str(key)))
+        self._evict(self._negative)
+        self.logger.info(f"[负缓存] {kind} {key} 标记为不可用 ({self.negative_ttl}s): {reason}")
+
+    def clear(self, target: str = "all") -> int:
+        """清空缓存
+
+        Args:
+            target: 'resolve'（解析缓存）、'negative'（负缓存）或 'all'
+
+        Returns:
+            清除的条目数
+        """
+        count = 0
+        if target in ("resolve", "all"):
+            count += len(self._groups)
+            self._groups.clear()
+        if target in ("negative", "all"):
+            count += len(self._negative)
+            self._negative.clear()
+        self.logger.info(f"[缓存] 已清空 {target} 缓存，共 {count} 条")
+        return count
+
+    def stats(self) -> dict:
+        """缓存条目统计"""
+        return {'resolve': len(self._groups), 'negative': len(self._negative)}
+
+    def _evict(self, table: OrderedDict):
+        while len(table) > self.max_entries:
+            table.popitem(last=False)
+
+
+# 插件级共享实例
+stream_group_cache = StreamGroupCache()
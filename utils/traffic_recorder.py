@@ -0,0 +1,177 @@
+import hashlib
+import itertools
+import json
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+from src.plugin_system import get_logger
+
+
+# 插件根目录，相对路径的trace文件以此为基准
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TrafficRecorder:
+    """NapCat请求录制器
+
+    将插件发往NapCat的请求、响应和耗时以紧凑JSONL格式追加写入trace文件，
+    供 scripts/replay_trace.py 离线回放。access_token从不写入，群号替换为
+    稳定的匿名数字，语音文本只记录长度。
+
+    每行格式：
+        {"ts": 请求发起时间戳, "src": 调用方, "call": 调用ID, "ep": 接口名,
+         "req": 请求体, "resp": 响应体, "http": HTTP状态码, "ms": 耗时, "err": 异常信息}
+    """
+
+    def __init__(self):
+        self.logger = get_logger("maimai_aivoice_plugin.recorder")
+        self.enabled = False
+        self.anonymize = True
+        self.trace_file: Optional[str] = None
+
+        self._file = None
+        self._failed_path: Optional[str] = None
+        self._salt = os.urandom(8).hex()
+        # 每个进程随机生成的会话前缀，保证追加写入同一trace时各次运行的调用ID不重复
+        self._session = os.urandom(4).hex()
+        self._call_counter = itertools.count(1)
+
+    def configure(self, enabled: bool, trace_file: str, anonymize: bool = True, salt: str = ""):
+        """更新录制参数，trace文件路径变化时重新打开"""
+        self.enabled = bool(enabled)
+        self.anonymize = bool(anonymize)
+        if salt:
+            self._salt = salt
+
+        path = trace_file if os.path.isabs(trace_file) else os.path.join(PLUGIN_DIR, trace_file)
+        if not self.enabled:
+            self.close()
+            self._failed_path = None
+        elif path != self.trace_file or (self._file is None and path != self._failed_path):
+            self.close()
+            # 录制失败不能影响工具本身，只记录警告；同一路径不再重复尝试
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self._file = open(path, "a", encoding="utf-8")
+                self._failed_path = None
+                self.logger.info(f"[录制] NapCat请求录制已开启: {path}")
+            except OSError as e:
+                self._failed_path = path
+                self.logger.warning(f"[录制] 无法打开trace文件，本次不录制: {e}")
+        self.trace_file = path
+
+    def configure_from(self, get_config: Callable[[str, Any], Any]):
+        """从组件的 get_config 读取 record.* 配置并更新录制参数"""
+        self.configure(
+            enabled=get_config("record.enabled", False),
+            trace_file=get_config("record.trace_file", "traces/napcat_trace.jsonl"),
+            anonymize=get_config("record.anonymize", True),
+            salt=get_config("record.anonymize_salt", "")
+        )
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def new_call_id(self) -> str:
+        """为一次工具/命令调用分配ID，同一调用内的多次NapCat请求共用此ID"""
+        return f"{self._session}-{next(self._call_counter)}"
+
+    def track(self, src: str, call_id: Optional[str], endpoint: str,
+              payload: Dict[str, Any]) -> "TrackedRequest":
+        """跟踪一次NapCat请求的耗时与结果，用法：
+
+            async with traffic_recorder.track("send_tool", call_id, "get_ai_characters", payload) as call, \
+                    aiohttp.ClientSession() as session:
+                async with session.post(...) as response:
+                    result = await call.read_json(response)
+        """
+        return TrackedRequest(self, src, call_id, endpoint, payload)
+
+    def record(self, src: str, call_id: Optional[str], endpoint: str, payload: Dict[str, Any],
+               result: Optional[Dict[str, Any]], elapsed: float, http_status: Optional[int] = None,
+               error: Optional[str] = None, started_at: Optional[float] = None):
+        """记录一次NapCat请求
+
+        Args:
+            src: 调用方（send_tool / list_tool / command）
+            call_id: new_call_id() 分配的调用ID
+            endpoint: 接口名（如 get_ai_characters）
+            payload: 请求体
+            result: NapCat返回的JSON，请求异常时为None
+            elapsed: 耗时（秒）
+            http_status: HTTP状态码
+            error: 请求异常信息
+            started_at: 请求发起时的时间戳（time.time()），回放按此还原到达时间；缺省为当前时间
+        """
+        if not self.enabled or self._file is None:
+            return
+
+        line = {
+            "ts": round(started_at if started_at is not None else time.time(), 3),
+            "src": src,
+            "call": call_id,
+            "ep": endpoint,
+            "req": self._sanitize_payload(payload),
+            "resp": result,
+            "http": http_status,
+            "ms": round(elapsed * 1000, 1),
+        }
+        if error:
+            line["err"] = error
+
+        try:
+            self._file.write(json.dumps(line, ensure_ascii=False, separators=(",", ":")) + "\n")
+            self._file.flush()
+        except Exception as e:
+            self.logger.warning(f"[录制] 写入trace失败: {e}")
+
+    def _sanitize_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        req = dict(payload)
+        if "group_id" in req and self.anonymize:
+            req["group_id"] = self._anonymize_group(req["group_id"])
+        if "text" in req:
+            req["text_len"] = len(req.pop("text") or "")
+        return req
+
+    def _anonymize_group(self, group_id) -> int:
+        # 加盐哈希映射为9位数字，同一次录制中保持稳定，回放时仍可作为int群号使用
+        digest = hashlib.sha256(f"{self._salt}:{group_id}".encode()).hexdigest()
+        return int(digest[:12], 16) % 900000000 + 100000000
+
+
+class TrackedRequest:
+    """单次NapCat请求的录制上下文，正常返回时在 read_json 中记录，异常时在退出时记录"""
+
+    def __init__(self, recorder: TrafficRecorder, src: str, call_id: Optional[str],
+                 endpoint: str, payload: Dict[str, Any]):
+        self._recorder = recorder
+        self._args = (src, call_id, endpoint, payload)
+        self._started = time.monotonic()
+        self._started_at = time.time()
+        self._http_status: Optional[int] = None
+        self._recorded = False
+
+    async def __aenter__(self) -> "TrackedRequest":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        if exc is not None and not self._recorded:
+            self._recorder.record(*self._args, None, time.monotonic() - self._started,
+                                  self._http_status, error=str(exc), started_at=self._started_at)
+        return False
+
+    async def read_json(self, response) -> Any:
+        """读取响应JSON并记录本次请求"""
+        self._http_status = response.status
+        result = await response.json()
+        self._recorded = True
+        self._recorder.record(*self._args, result, time.monotonic() - self._started, self._http_status,
+                              started_at=self._started_at)
+        return result
+
+
+# 插件级共享实例
+traffic_recorder = TrafficRecorder()
@@ -0,0 +1,172 @@
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.plugin_system import get_logger
+
+
+# 发送任务：无参协程工厂，返回 _send_ai_voice 风格的结果字典 {'success': ..., 'message_id'/'error': ...}
+SendJob = Callable[[], Awaitable[Dict[str, Any]]]
+# 失败回调：接收任务状态字典，用于把失败信息反馈到聊天
+FailureCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class VoiceSendQueue:
+    """AI语音异步发送队列
+
+    工具调用时只负责入队并立即返回，由后台worker池实际调用NapCat发送语音，
+    发送结果（message_id或错误信息）记录在有界的状态表中供查询。
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 50, status_table_size: int = 100):
+        self.logger = get_logger("maimai_aivoice_plugin.send_queue")
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.status_table_size = status_table_size
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers: List[asyncio.Task] = []
+        self._active = 0
+        self._status: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._task_counter = itertools.count(1)
+
+    def configure(self, max_workers: int, max_pending: int, status_table_size: int):
+        """更新队列参数
+
+        队列容量和worker数量的变化在队列空闲（无排队和发送中的任务）时的下一次提交时生效，
+        届时会重建队列和worker池；状态表容量立即生效。
+        """
+        self.max_workers = max(1, int(max_workers))
+        self.max_pending = max(1, int(max_pending))
+        self.status_table_size = max(1, int(status_table_size))
+        self._trim_status()
+
+    def submit(self, job: SendJob, group_id: str, character_name: str, text: str,
+               on_failure: Optional[FailureCallback] = None) -> Dict[str, Any]:
+        """提交发送任务，不等待发送完成
+
+        Returns:
+            {'success': True, 'task_id': ...} 或 {'success': False, 'error': ...}
+        """
+        self._ensure_workers()
+
+        task_id = f"v{next(self._task_counter)}"
+        entry = {
+            'task_id': task_id,
+            'group_id': str(group_id),
+            'character_name': character_name,
+            'text': text,
+            'status': 'pending',
+            'message_id': None,
+            'error': None,
+            'created_at': time.time(),
+            'finished_at': None,
+        }
+
+        try:
+            self._queue.put_nowait((entry, job, on_failure))
+        except asyncio.QueueFull:
+            self.logger.warning(f"[队列] 发送队列已满 ({self._queue.maxsize})，拒绝任务")
+            return {'success': False, 'error': f"发送队列已满（{self._queue.maxsize}个任务等待中），请稍后再试"}
+
+        self._record(entry)
+        self.logger.info(f"[队列] 已入队发送任务 {task_id}: 群{group_id} 角色'{character_name}'")
+        return {'success': True, 'task_id': task_id}
+
+    def get_status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """按task_id查询发送状态，已被淘汰或不存在时返回None"""
+        entry = self._status.get(task_id)
+        return dict(entry) if entry else None
+
+    def list_recent(self, limit: int = 10, group_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """获取最近的发送状态（新的在前），可按群号过滤"""
+        result = []
+        for entry in reversed(self._status.values()):
+            if group_id is not None and entry['group_id'] != str(group_id):
+                continue
+            result.append(dict(entry))
+            if len(result) >= limit:
+                break
+        return result
+
+    def _record(self, entry: Dict[str, Any]):
+        self._status[entry['task_id']] = entry
+        self._trim_status()
+
+    def _trim_status(self):
+        # 超出容量时优先淘汰最早的已完成任务，避免丢掉仍在进行中的状态
+        while len(self._status) > self.status_table_size:
+            for task_id, entry in self._status.items():
+                if entry['status'] in ('success', 'failed'):
+                    del self._status[task_id]
+                    break
+            else:
+                self._status.popitem(last=False)
+
+    def _ensure_workers(self):
+        """懒启动worker池；事件循环变更（如重载）或空闲时配置变化则重建队列和worker池"""
+        loop = asyncio.get_running_loop()
+        self._workers = [w for w in self._workers if not w.done()]
+
+        if self._loop is not loop or self._queue is None:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._workers = []
+        elif self._queue.empty() and self._active == 0 and (
+                self._queue.maxsize != self.max_pending or len(self._workers) != self.max_workers):
+            # 空闲worker都阻塞在queue.get()上，直接取消不会中断发送
+            for worker in self._workers:
+                worker.cancel()
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._workers = []
+            self.logger.info(f"[队列] 按新配置重建: max_workers={self.max_workers}, max_pending={self.max_pending}")
+
+        while len(self._workers) < self.max_workers:
+            index = len(self._workers)
+            self._workers.append(loop.create_task(self._worker(index)))
+
+    async def _worker(self, index: int):
+        queue = self._queue
+        while True:
+            entry, job, on_failure = await queue.get()
+            self._active += 1
+            try:
+                await self._run_job(index, entry, job, on_failure)
+            finally:
+                self._active -= 1
+                queue.task_done()
+
+    async def _run_job(self, index: int, entry: Dict[str, Any], job: SendJob,
+                       on_failure: Optional[FailureCallback]):
+        task_id = entry['task_id']
+        entry['status'] = 'sending'
+        self.logger.info(f"[worker-{index}] 开始发送任务 {task_id}")
+
+        try:
+            result = await job()
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+
+        entry['finished_at'] = time.time()
+        if result.get('success'):
+            entry['status'] = 'success'
+            entry['message_id'] = result.get('message_id', '')
+            self.logger.info(f"[worker-{index}] 任务 {task_id} 发送成功! message_id={entry['message_id']}")
+            return
+
+        entry['status'] = 'failed'
+        entry['error'] = result.get('error', '未知错误')
+        self.logger.error(f"[worker-{index}] 任务 {task_id} 发送失败: {entry['error']}")
+
+        if on_failure:
+            try:
+                await on_failure(dict(entry))
+            except Exception as e:
+                self.logger.warning(f"[worker-{index}] 失败回报发送失败: {e}")
+
+
+# 插件级共享实例（工具每次调用都会重新实例化，状态必须放在模块级）
+voice_send_queue = VoiceSendQueue()